@@ -1,6 +1,8 @@
-import { execa, type ExecaError } from 'execa';
+import { spawn, type ChildProcessWithoutNullStreams } from 'node:child_process';
 import { join, resolve, isAbsolute, basename } from 'node:path';
 import { homedir } from 'node:os';
+import { stat } from 'node:fs/promises';
+import type { Stats } from 'node:fs';
 import { type Config } from './config.js';
 import type {
   CommandResult,
@@ -11,6 +13,7 @@ import type {
 import {
   CommandValidationError
 } from './types.js';
+import { truncateStart } from './utils.js';
 
 const INJECTION_PATTERNS = [
   /\$[^a-zA-Z_]/, // $ followed by non-alphabetic character
@@ -27,16 +30,308 @@ const INJECTION_PATTERNS = [
   />[^>]/, // Output redirection (except >>)
 ] as const;
 
+// Every injection pattern requires at least one of these characters
+const INJECTION_TRIGGER_CHARS: ReadonlySet<string> = new Set(['$', '`', '<', '>', '|', '&', ';']);
+
+// Surrounding quotes stripped from cd arguments
+const SURROUNDING_QUOTES_PATTERN = /^["']|["']$/g;
+
+// A line that only changes directory, safe to apply without the shell
+const CD_LINE_PATTERN = /^cd(?:\s+\S+)?$/;
+
+// Only these builtins move the shell's working directory
+const DIRECTORY_COMMANDS: ReadonlySet<string> = new Set(['cd', 'pushd', 'popd']);
+const COMMAND_SEPARATOR_CHARS: ReadonlySet<string> = new Set([';', '&', '|', '\n']);
+const TOKEN_WHITESPACE_CHARS: ReadonlySet<string> = new Set([' ', '\t', '\r', '\v', '\f']);
+
+// Output kept per stream so memory stays bounded; older output is dropped.
+// What reaches the model is cut much shorter when the tool message is built
+const MAX_OUTPUT_CHARS = 1024 * 1024;
+
+const SINGLE_QUOTE_PATTERN = /'/g;
+const TRAILING_NEWLINE_PATTERN = /\r?\n$/;
+
+interface CommandScan {
+  // Whether any character an injection pattern needs is present
+  hasInjectionTrigger: boolean;
+  // First word of every separator-delimited segment
+  baseCommands: string[];
+}
+
+// One pass over the command that feeds both the injection fast path and the
+// cd detection, instead of a character scan, a regex split and a per-segment trim
+function scanCommand(command: string): CommandScan {
+  const baseCommands: string[] = [];
+  let hasInjectionTrigger = false;
+  let atSegmentStart = true;
+  let tokenStart = -1;
+
+  for (let i = 0; i <= command.length; i++) {
+    const char = command[i];
+    const isEnd = char === undefined;
+    const isSeparator = isEnd || COMMAND_SEPARATOR_CHARS.has(char);
+    const isWhitespace = !isEnd && TOKEN_WHITESPACE_CHARS.has(char);
+
+    if (!isEnd && INJECTION_TRIGGER_CHARS.has(char)) {
+      hasInjectionTrigger = true;
+    }
+
+    // Close the head token of the current segment
+    if (tokenStart !== -1 && (isSeparator || isWhitespace)) {
+      baseCommands.push(command.substring(tokenStart, i));
+      tokenStart = -1;
+      atSegmentStart = false;
+    }
+
+    if (isSeparator) {
+      atSegmentStart = true;
+    } else if (atSegmentStart && !isWhitespace && tokenStart === -1) {
+      tokenStart = i;
+    }
+  }
+
+  return { hasInjectionTrigger, baseCommands };
+}
+
+function quoteForShell(value: string): string {
+  return `'${value.replace(SINGLE_QUOTE_PATTERN, `'\\''`)}'`;
+}
+
+interface ShellOutput {
+  stdout: string;
+  stderr: string;
+  cwd: string;
+  exitCode: number;
+}
+
+// One long-lived bash process shared by every command. Each command is written
+// to its stdin followed by end markers on stdout and stderr, so running a
+// command costs pipe I/O instead of a fork/exec of a fresh shell.
+class PersistentShell {
+  private _process: ChildProcessWithoutNullStreams | null = null;
+  private _queue: Promise<unknown> = Promise.resolve();
+  private _sequence: number = 0;
+
+  constructor(
+    private readonly _env: NodeJS.ProcessEnv,
+    private readonly _timeout: number
+  ) {
+    // The shell runs detached, so terminal signals never reach it; kill its
+    // process group whenever Node exits, including via process.exit()
+    process.on('exit', () => this.dispose());
+  }
+
+  start(cwd: string): ChildProcessWithoutNullStreams {
+    if (this._process) {
+      return this._process;
+    }
+
+    // Own process group so a timed out command can be killed with its children
+    const proc = spawn('/bin/bash', ['--noprofile', '--norc'], {
+      cwd,
+      env: this._env,
+      stdio: 'pipe',
+      detached: true,
+    });
+
+    proc.stdout.setEncoding('utf8');
+    proc.stderr.setEncoding('utf8');
+    proc.stdin.on('error', () => {
+      // Writes after the shell exited; surfaced through the 'close' handler
+    });
+
+    const forget = (): void => {
+      if (this._process === proc) {
+        this._process = null;
+      }
+    };
+    proc.on('close', forget);
+    proc.on('error', forget);
+
+    this._process = proc;
+    return proc;
+  }
+
+  run(
+    command: string,
+    cwd: string,
+    trackCwd: boolean = true,
+    onOutput?: (chunk: string) => void
+  ): Promise<ShellOutput> {
+    // Commands share one shell, so they must never interleave
+    const output = this._queue.then(() => this._execute(command, cwd, trackCwd, onOutput));
+    this._queue = output.catch(() => undefined);
+    return output;
+  }
+
+  dispose(): void {
+    const proc = this._process;
+    this._process = null;
+
+    if (proc?.pid !== undefined) {
+      try {
+        process.kill(-proc.pid, 'SIGKILL');
+      } catch {
+        // Process group already gone
+      }
+    }
+  }
+
+  private _execute(
+    command: string,
+    cwd: string,
+    trackCwd: boolean,
+    onOutput?: (chunk: string) => void
+  ): Promise<ShellOutput> {
+    const proc = this.start(cwd);
+    const marker = `__END_${process.pid}_${++this._sequence}__`;
+    const stdoutMarker = `\n${marker} `;
+    const stderrMarker = `\n${marker}\n`;
+
+    return new Promise(resolve => {
+      let stdout = '';
+      let stderr = '';
+      let status: { exitCode: number; cwd: string } | null = null;
+      let stderrDone = false;
+      let searchFrom = 0;
+      let stdoutOmitted = 0;
+      let stderrOmitted = 0;
+
+      const finish = (output: ShellOutput): void => {
+        clearTimeout(timer);
+        proc.stdout.off('data', onStdout);
+        proc.stderr.off('data', onStderr);
+        proc.off('close', onClose);
+        proc.off('error', onError);
+        // The chunk carrying the marker skips the rolling trim, so cap again here
+        resolve({
+          ...output,
+          stdout: truncateStart(output.stdout, MAX_OUTPUT_CHARS, stdoutOmitted),
+          stderr: truncateStart(output.stderr, MAX_OUTPUT_CHARS, stderrOmitted),
+        });
+      };
+
+      const finishIfComplete = (): void => {
+        if (status && stderrDone) {
+          finish({ stdout, stderr, ...status });
+        }
+      };
+
+      const onStdout = (chunk: string): void => {
+        if (status) {
+          return;
+        }
+        const previousLength = stdout.length;
+        stdout += chunk;
+
+        // Status line: "<marker> <exit code>[ <pwd>]\n"
+        const index = stdout.indexOf(stdoutMarker, searchFrom);
+        if (index === -1) {
+          // Keep only the tail; it still covers a marker split across chunks
+          if (stdout.length > MAX_OUTPUT_CHARS) {
+            const excess = stdout.length - MAX_OUTPUT_CHARS;
+            stdout = stdout.slice(excess);
+            stdoutOmitted += excess;
+          }
+          searchFrom = Math.max(0, stdout.length - stdoutMarker.length);
+          onOutput?.(chunk);
+          return;
+        }
+        if (index > previousLength) {
+          onOutput?.(stdout.substring(previousLength, index));
+        }
+        if (!stdout.endsWith('\n')) {
+          return;
+        }
+
+        const line = stdout.slice(index + stdoutMarker.length, -1);
+        const separator = line.indexOf(' ');
+        status = separator === -1
+          ? { exitCode: Number(line), cwd }
+          : { exitCode: Number(line.substring(0, separator)), cwd: line.substring(separator + 1) };
+        stdout = stdout.substring(0, index);
+        finishIfComplete();
+      };
+
+      const onStderr = (chunk: string): void => {
+        const previousLength = stderr.length;
+        stderr += chunk;
+        if (stderr.endsWith(stderrMarker)) {
+          stderr = stderr.slice(0, -stderrMarker.length);
+          if (stderr.length > previousLength) {
+            onOutput?.(stderr.substring(previousLength));
+          }
+          stderrDone = true;
+          finishIfComplete();
+          return;
+        }
+
+        if (stderr.length > MAX_OUTPUT_CHARS) {
+          const excess = stderr.length - MAX_OUTPUT_CHARS;
+          stderr = stderr.slice(excess);
+          stderrOmitted += excess;
+        }
+        onOutput?.(chunk);
+      };
+
+      const onClose = (code: number | null): void => {
+        // The command ended the shell itself (e.g. `exit`); respawned on next run
+        finish({ stdout, stderr, cwd, exitCode: code ?? 1 });
+      };
+
+      const onError = (error: Error): void => {
+        finish({ stdout, stderr: stderr || error.message, cwd, exitCode: 1 });
+      };
+
+      const timer = setTimeout(() => {
+        this.dispose();
+        finish({
+          stdout,
+          stderr: `${stderr}Command timed out after ${this._timeout}ms`,
+          cwd,
+          exitCode: 124,
+        });
+      }, this._timeout);
+
+      proc.stdout.on('data', onStdout);
+      proc.stderr.on('data', onStderr);
+      proc.on('close', onClose);
+      proc.on('error', onError);
+
+      // Only report $PWD when the command may have moved it
+      const statusLine = trackCwd
+        ? `printf '\\n%s %d %s\\n' ${marker} "$?" "$PWD"\n`
+        : `printf '\\n%s %d\\n' ${marker} "$?"\n`;
+
+      // eval keeps syntax errors in the command from swallowing the markers
+      proc.stdin.write(
+        `cd -- ${quoteForShell(cwd)} && eval ${quoteForShell(command)} < /dev/null\n` +
+        statusLine +
+        `printf '\\n%s\\n' ${marker} >&2\n`
+      );
+    });
+  }
+}
+
 export class Bash {
   private _cwd: string;
   private readonly _config: Config;
   private readonly _env: NodeJS.ProcessEnv;
+  private readonly _shell: PersistentShell;
+  private readonly _toolSchema: ToolSchema;
 
   constructor(config: Config) {
     this._config = config;
     this._cwd = config.rootDir;
     this._env = { ...process.env };
 
+    // The schema never changes, so build it once instead of on every LLM turn
+    this._toolSchema = config.bashToolSchema;
+
+    // Start the shell up front so the first command skips the spawn
+    this._shell = new PersistentShell(this._env, config.security.commandTimeout);
+    this._shell.start(this._cwd);
+
     // Initialize the working directory
     void this.initializeWorkingDirectory();
   }
@@ -46,49 +341,15 @@ export class Bash {
   }
 
   private async initializeWorkingDirectory(): Promise<void> {
-    try {
-      // Validate and set the initial working directory
-      const result = await this.executeCommand(`cd "${this._cwd}"`);
-      if (result.exitCode !== 0) {
-        console.error(`Warning: Could not set initial working directory to ${this._cwd}`);
-      }
-    } catch (error) {
-      console.error(`Warning: Failed to initialize working directory: ${error}`);
+    // Validate the initial working directory in-process; no shell needed
+    if (!(await this._isDirectory(this._cwd))) {
+      console.error(`Warning: Could not set initial working directory to ${this._cwd}`);
     }
   }
 
-  private _splitCommands(command: string): string[] {
-    // Split by spaces, but preserve quoted strings
-    const parts: string[] = [];
-    let current = '';
-    let inQuotes = false;
-    let quoteChar = '';
-
-    for (let i = 0; i < command.length; i++) {
-      const char = command[i];
-
-      if (!inQuotes && (char === '"' || char === "'")) {
-        inQuotes = true;
-        quoteChar = char;
-      } else if (inQuotes && char === quoteChar) {
-        inQuotes = false;
-        quoteChar = '';
-      } else if (!inQuotes && char === ' ') {
-        if (current) {
-          parts.push(current);
-          current = '';
-        }
-        continue;
-      }
-
-      current += char;
-    }
-
-    if (current) {
-      parts.push(current);
-    }
-
-    return parts;
+  private async _isDirectory(path: string): Promise<boolean> {
+    const stats = await this._stat(path);
+    return stats?.isDirectory() ?? false;
   }
 
   private _checkForInjection(command: string): void {
@@ -102,20 +363,56 @@ export class Bash {
     }
   }
 
-  async execBashCommand(command: string): Promise<CommandResult> {
-    // Check for injection patterns first
-    this._checkForInjection(command);
+  async execBashCommand(
+    command: string,
+    onOutput?: (chunk: string) => void
+  ): Promise<CommandResult> {
+    // Trim once; LLM tool calls often arrive padded with whitespace
+    const trimmed = command.trim();
+
+    const scan = scanCommand(trimmed);
+
+    // Check for injection patterns first; plain commands never reach the regexes
+    if (scan.hasInjectionTrigger) {
+      this._checkForInjection(trimmed);
+    }
+
+    // Validate every segment of the command against the allowlist
+    this._config.validateCommand(trimmed, scan.baseCommands);
+
+    // Apply leading `cd <dir>` lines in-process; only the rest needs the shell
+    let remaining = trimmed;
+    let peeled = 0;
+    let newline = remaining.indexOf('\n');
+    while (newline !== -1) {
+      const line = remaining.substring(0, newline).trim();
+      if (!CD_LINE_PATTERN.test(line)) {
+        break;
+      }
 
-    // Validate command against allowlist
-    this._config.validateCommand(command);
+      const cdResult = await this.handleCdCommand(line);
+      if (cdResult.exitCode !== 0) {
+        // Unlike bash, don't go on to run the rest in the wrong directory
+        return cdResult;
+      }
 
-    // Special handling for cd command
-    if (command.trim().startsWith('cd ')) {
-      return this.handleCdCommand(command);
+      remaining = remaining.substring(newline + 1).trim();
+      newline = remaining.indexOf('\n');
+      peeled++;
     }
 
-    // Execute regular command with NVIDIA's wrapping pattern
-    return this.executeCommandWithWrapper(command);
+    // Special handling for cd command (bare `cd` goes home, as in bash)
+    if (newline === -1 && (remaining === 'cd' || remaining.startsWith('cd '))) {
+      return this.handleCdCommand(remaining);
+    }
+
+    // Execute regular command with NVIDIA's wrapping pattern; each peeled line
+    // contributed exactly one base command
+    return this.executeCommandWithWrapper(
+      remaining,
+      this._mayChangeDirectory(scan.baseCommands.slice(peeled)),
+      onOutput
+    );
   }
 
   private async handleCdCommand(command: string): Promise<CommandResult> {
@@ -126,10 +423,8 @@ export class Bash {
       // Resolve the new working directory
       const newCwd = this.resolvePath(dirPath);
 
-      // Check if directory exists
-      const checkResult = await this.executeCommand(`test -d "${newCwd}" && echo "EXISTS"`);
-
-      if (checkResult.exitCode !== 0 || !checkResult.stdout.includes('EXISTS')) {
+      // Check if directory exists without spawning a shell
+      if (!(await this._isDirectory(newCwd))) {
         return {
           stdout: '',
           stderr: `Directory does not exist: ${newCwd}`,
@@ -158,13 +453,13 @@ export class Bash {
   }
 
   private extractDirectoryPath(command: string): string {
-    // Remove 'cd ' prefix and strip whitespace
-    return command.trim().substring(3).trim().replace(/^["']|["']$/g, '');
+    // Remove 'cd' prefix (command is already trimmed) and strip whitespace
+    return command.substring(2).trim().replace(SURROUNDING_QUOTES_PATTERN, '');
   }
 
   private resolvePath(path: string): string {
     // Handle special cases
-    if (path === '~' || path === '~/') {
+    if (path === '' || path === '~' || path === '~/') {
       return homedir();
     }
 
@@ -181,74 +476,45 @@ export class Bash {
     return resolve(this._cwd, path);
   }
 
-  private async executeCommandWithWrapper(command: string): Promise<CommandResult> {
+  private _mayChangeDirectory(baseCommands: readonly string[]): boolean {
+    // The shell is moved back to this._cwd before every command, so a missed
+    // case only leaves the reported directory stale
+    return baseCommands.some(baseCommand => DIRECTORY_COMMANDS.has(baseCommand));
+  }
+
+  private async executeCommandWithWrapper(
+    command: string,
+    trackCwd: boolean,
+    onOutput?: (chunk: string) => void
+  ): Promise<CommandResult> {
     const startTime = Date.now();
 
     try {
-      // Wrap command with NVIDIA's pattern: command; echo __END__; pwd
-      const wrappedCommand = `${command}; echo __END__; pwd`;
+      // The shell frames the output with an end marker carrying the exit code,
+      // plus the new pwd when the command can change directory
+      const result = await this._shell.run(
+        command,
+        this._cwd,
+        trackCwd,
+        onOutput
+      );
 
-      // Execute wrapped command with timeout
-      const result = await execa(wrappedCommand, {
-        shell: true,
-        cwd: this._cwd,
-        env: this._env,
-        timeout: this._config.security.commandTimeout,
-        extendEnv: false,
-        cleanup: true,
-        stripFinalNewline: false, // Keep newlines for parsing
-      });
-
-      // Parse output to separate stdout, stderr, and new cwd
-      const output = result.stdout || '';
-      const stderr = result.stderr || '';
-
-      // Split output by __END__ marker
-      const parts = output.split('__END__');
-      const stdout = parts[0]?.trim() ?? '';
-      const newCwd = parts[1]?.trim() ?? this._cwd;
+      const stdout = result.stdout.trim();
 
       // Update working directory
-      this._cwd = newCwd;
+      this._cwd = result.cwd;
 
       // If no stdout output, provide success message
-      const finalStdout = stdout || 'Command executed successfully, without any output.';
+      const finalStdout = stdout || (result.exitCode === 0
+        ? 'Command executed successfully, without any output.'
+        : '');
 
       return {
         stdout: finalStdout,
-        stderr: stderr,
-        cwd: newCwd,
+        stderr: result.stderr,
+        cwd: result.cwd,
         exitCode: result.exitCode,
       };
-    } catch (error) {
-      // Handle execution errors
-      if (error instanceof Error && 'exitCode' in error) {
-        const execError = error as unknown as {
-          exitCode?: number;
-          stdout?: string | unknown[];
-          stderr?: string | unknown[];
-          command: string;
-          message?: string
-        };
-
-        const stdout = typeof execError.stdout === 'string' ? execError.stdout : '';
-        const stderr = typeof execError.stderr === 'string' ? execError.stderr : execError.message || 'Unknown error';
-
-        return {
-          stdout: stdout,
-          stderr: stderr,
-          cwd: this._cwd,
-          exitCode: execError.exitCode ?? 1,
-        };
-      }
-
-      // Handle unexpected errors
-      return {
-        stdout: '',
-        stderr: error instanceof Error ? error.message : String(error),
-        cwd: this._cwd,
-        exitCode: 1,
-      };
     } finally {
       const duration = Date.now() - startTime;
       if (process.env['NODE_ENV'] === 'development') {
@@ -261,79 +527,23 @@ export class Bash {
     const startTime = Date.now();
 
     try {
-      // Execute command with timeout
-      const result = await execa(command, {
-        shell: true,
-        cwd: this._cwd,
-        env: this._env,
-        timeout: this._config.security.commandTimeout,
-        extendEnv: false,
-        cleanup: true,
-        stripFinalNewline: true,
-      });
+      // Helper commands run in the same shell but never move the working directory
+      const result = await this._shell.run(command, this._cwd, false);
 
       // Handle output - NVIDIA approach
-      let stdout = result.stdout;
-      let stderr = result.stderr;
-      let newCwd = this._cwd;
+      let stdout = result.stdout.replace(TRAILING_NEWLINE_PATTERN, '');
+      const stderr = result.stderr.replace(TRAILING_NEWLINE_PATTERN, '');
 
       // If no output, provide success message (like NVIDIA's implementation)
-      if (!stdout && !stderr) {
+      if (!stdout && !stderr && result.exitCode === 0) {
         stdout = 'Command executed successfully, without any output.';
       }
 
-      // Only check for directory changes if it's a cd command
-      if (command.trim().startsWith('cd ')) {
-        // Execute a separate pwd to get the current directory
-        try {
-          const pwdResult = await execa('pwd', {
-            shell: true,
-            cwd: this._cwd,
-            timeout: 1000,
-            stripFinalNewline: true,
-          });
-          newCwd = pwdResult.stdout.trim();
-          this._cwd = newCwd;
-        } catch {
-          // If pwd fails, keep current directory
-        }
-      }
-
-      return {
-        stdout: stdout || '',
-        stderr: stderr || '',
-        cwd: newCwd,
-        exitCode: result.exitCode,
-      };
-    } catch (error) {
-      // Handle execution errors
-      if (error instanceof Error && 'exitCode' in error) {
-        const execError = error as unknown as { exitCode?: number; stdout?: string | unknown[]; stderr?: string | unknown[]; command: string; message?: string };
-
-        // Update working directory if available in error output
-        let newCwd = this._cwd;
-        if (execError.stdout && typeof execError.stdout === 'string') {
-          const lines = execError.stdout.split('\n');
-          const lastLine = lines[lines.length - 1]?.trim();
-          if (lastLine && lastLine !== execError.command) {
-            newCwd = lastLine;
-          }
-        }
-
-        return {
-          stdout: typeof execError.stdout === 'string' ? execError.stdout : '',
-          stderr: typeof execError.stderr === 'string' ? execError.stderr : execError.message || 'Unknown error',
-          cwd: newCwd,
-          exitCode: execError.exitCode ?? 1,
-        };
-      }
-
-      // Handle unexpected errors
       return {
-        stdout: '',
-        stderr: error instanceof Error ? error.message : String(error),
+        stdout,
+        stderr,
         cwd: this._cwd,
-        exitCode: 1,
+        exitCode: result.exitCode,
       };
     } finally {
       const duration = Date.now() - startTime;
@@ -343,8 +553,12 @@ export class Bash {
     }
   }
 
+  dispose(): void {
+    this._shell.dispose();
+  }
+
   getToolSchema(): ToolSchema {
-    return this._config.bashToolSchema;
+    return this._toolSchema;
   }
 
   getExecutionContext(): ExecutionContext {
@@ -360,28 +574,24 @@ export class Bash {
   }
 
   async fileExists(filename: string): Promise<boolean> {
-    try {
-      const result = await this.executeCommand(`test -f "${filename}" && echo "EXISTS"`);
-      return result.stdout.includes('EXISTS');
-    } catch {
-      return false;
-    }
+    const stats = await this._stat(filename);
+    return stats?.isFile() ?? false;
   }
 
   async directoryExists(dirname: string): Promise<boolean> {
-    try {
-      const result = await this.executeCommand(`test -d "${dirname}" && echo "EXISTS"`);
-      return result.stdout.includes('EXISTS');
-    } catch {
-      return false;
-    }
+    const stats = await this._stat(dirname);
+    return stats?.isDirectory() ?? false;
   }
 
   async getFileSize(filename: string): Promise<number | null> {
+    const stats = await this._stat(filename);
+    return stats?.isFile() ? stats.size : null;
+  }
+
+  private async _stat(path: string): Promise<Stats | null> {
+    // One stat syscall, resolved against the tracked cwd; no shell round trip
     try {
-      const result = await this.executeCommand(`wc -c < "${filename}"`);
-      const size = parseInt(result.stdout.trim(), 10);
-      return isNaN(size) ? null : size;
+      return await stat(resolve(this._cwd, path));
     } catch {
       return null;
     }
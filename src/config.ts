@@ -15,6 +15,7 @@ import {
   CommandValidationError,
   envSchema
 } from './types.js';
+import { extractBaseCommand } from './utils.js';
 
 config();
 
@@ -38,6 +39,8 @@ export const AVAILABLE_MODELS: readonly ModelConfig[] = Object.freeze([
   },
 ] as const);
 
+// Only the first token of a command is checked, so every entry must be a
+// single word; subcommands such as 'git log' are covered by 'git'.
 const DEFAULT_ALLOWED_COMMANDS = Object.freeze([
   // File operations
   'cd', 'cp', 'ls', 'cat', 'find', 'touch', 'echo', 'grep', 'pwd', 'mkdir',
@@ -64,38 +67,34 @@ const DEFAULT_ALLOWED_COMMANDS = Object.freeze([
 
   // Development tools
   'python', 'python3', 'pip', 'pip3', 'node', 'npm', 'yarn', 'pnpm',
-  'npx', 'yarn dlx', 'pnpm dlx',
+  'npx',
 
   // Version control
   'git', 'gh', 'svn', 'hg',
-  'git log', 'git status', 'git diff', 'git show', 'git blame',
 
   // Archive and compression
   'tar', 'zip', 'unzip', 'gzip', 'gunzip', 'bzip2', 'bunzip2',
 
   // Process management (read-only)
-  'ps', 'top', 'htop', 'pgrep', 'pidof',
+  'htop', 'pgrep', 'pidof',
   'pstree', 'jobs', 'fg', 'bg',
 
   // File permissions (viewing only)
-  'ls -l', 'stat', 'getfacl', 'lsattr',
+  'stat', 'getfacl', 'lsattr',
 
   // Search utilities
-  'find', 'locate', 'which', 'whereis', 'grep -r', 'rg', 'ag',
+  'locate', 'rg', 'ag',
 
   // System monitoring (read-only)
   'iostat', 'vmstat', 'sar', 'sysctl',
 
-  // Safe redirection commands
-  '>', '>>', '<', '2>', '2>>', '&>', '&>>',
-
-  // Safe pipe operators
-  '|', '&&', '||',
-
   // Temporary file creation
   'mktemp', 'tempfile', 'with-tempfile',
 ] as const);
 
+// Precompiled patterns used on every command validation
+const PIPE_REDIRECT_PATTERN = /[|>]/;
+
 const DEFAULT_SECURITY_CONFIG: SecurityConfig = Object.freeze({
   allowedCommands: DEFAULT_ALLOWED_COMMANDS,
   blockedPatterns: Object.freeze([
@@ -214,6 +213,7 @@ const DEFAULT_SECURITY_CONFIG: SecurityConfig = Object.freeze({
 export class Config {
   private readonly _llm: LLMConfig;
   private readonly _security: SecurityConfig;
+  private readonly _allowedCommands: ReadonlySet<string>;
   private readonly _rootDir: string;
 
   constructor(modelName?: string) {
@@ -233,6 +233,9 @@ export class Config {
     // Use default security configuration
     this._security = DEFAULT_SECURITY_CONFIG;
 
+    // Build the allowlist lookup once for O(1) membership checks
+    this._allowedCommands = new Set(this._security.allowedCommands);
+
     // Set root directory to the project root
     this._rootDir = join(__dirname, '..');
 
@@ -371,25 +374,29 @@ Be helpful but always stay within the allowed command list!`;
 
   isCommandAllowed(command: string): boolean {
     // Get the base command (first word)
-    const baseCommand = command.trim().split(/\s+/)[0];
-    return this._security.allowedCommands.some(allowed => allowed === baseCommand);
+    return this._allowedCommands.has(extractBaseCommand(command));
   }
 
   hasBlockedPatterns(command: string): boolean {
     return this._security.blockedPatterns.some(pattern => pattern.test(command));
   }
 
-  validateCommand(command: string): void {
-    if (!command.trim()) {
+  validateCommand(command: string, baseCommands?: readonly string[]): void {
+    const trimmed = command.trim();
+    if (!trimmed) {
       throw new CommandValidationError('Command cannot be empty', command);
     }
 
-    if (!this.isCommandAllowed(command)) {
-      const baseCommand = command.trim().split(/\s+/)[0];
-      throw new CommandValidationError(
-        `Command '${baseCommand}' is not in the allowlist`,
-        command
-      );
+    // Newline-separated segments each run, so every segment's head is checked;
+    // stop at the first one that is not allowed
+    const heads = baseCommands?.length ? baseCommands : [extractBaseCommand(trimmed)];
+    for (const baseCommand of heads) {
+      if (!this._allowedCommands.has(baseCommand)) {
+        throw new CommandValidationError(
+          `Command '${baseCommand}' is not in the allowlist`,
+          command
+        );
+      }
     }
 
     if (this.hasBlockedPatterns(command)) {
@@ -400,7 +407,7 @@ Be helpful but always stay within the allowed command list!`;
     }
 
     // Check for pipes and redirects if not allowed
-    if (!this._security.allowPipesAndRedirects && /[|>]/.test(command)) {
+    if (!this._security.allowPipesAndRedirects && PIPE_REDIRECT_PATTERN.test(command)) {
       throw new CommandValidationError(
         'Pipes and redirects are not currently allowed for safety',
         command
@@ -1,4 +1,6 @@
 import { OpenAI } from 'openai';
+import { Agent as HttpAgent, request as httpRequest } from 'node:http';
+import { Agent as HttpsAgent, request as httpsRequest } from 'node:https';
 import type { Config } from './config.js';
 import type {
   Message,
@@ -33,6 +35,7 @@ export interface LLMResponse {
 
 export class LLMClient {
   private readonly _client: OpenAI;
+  private readonly _agent: HttpAgent;
   private readonly _config: Config;
   private readonly _maxRetries: number = 3;
   private readonly _retryDelay: number = 1000; // 1 second
@@ -40,10 +43,24 @@ export class LLMClient {
   constructor(config: Config) {
     this._config = config;
 
+    // One long-lived keep-alive pool: sequential queries to the same host reuse
+    // a connection instead of paying a TCP/TLS handshake each time
+    const agentOptions = {
+      keepAlive: true,
+      keepAliveMsecs: 30000,
+      maxSockets: 4,
+      maxFreeSockets: 4,
+      timeout: 300000, // Drop sockets idle for 5 minutes
+    };
+    this._agent = new URL(config.llm.baseUrl).protocol === 'http:'
+      ? new HttpAgent(agentOptions)
+      : new HttpsAgent(agentOptions);
+
     // Initialize OpenAI client with custom configuration
     this._client = new OpenAI({
       baseURL: config.llm.baseUrl,
       apiKey: config.llm.apiKey,
+      httpAgent: this._agent,
       timeout: 60000, // 60 seconds timeout
       maxRetries: 0, // We'll handle retries ourselves
       defaultHeaders: {
@@ -60,18 +77,30 @@ export class LLMClient {
   async query(
     messages: MessageManager,
     tools: ToolSchema[],
-    maxTokens?: number
+    maxTokens?: number,
+    onContent?: (delta: string) => void
   ): Promise<LLMResponse> {
     const startTime = Date.now();
     let lastError: Error | null = null;
+    let attempts = 0;
+
+    // Once text has reached the caller a retry would replay it on top of the
+    // partial answer, so only failures before the first delta are retried
+    let emitted = false;
+    const forwardContent = onContent && ((delta: string): void => {
+      emitted = true;
+      onContent(delta);
+    });
 
     // Retry logic for transient errors
     for (let attempt = 1; attempt <= this._maxRetries; attempt++) {
+      attempts = attempt;
       try {
         const response = await this._executeQuery(
           messages.getMessages(),
           tools,
-          maxTokens
+          maxTokens,
+          forwardContent
         );
 
         const responseTime = Date.now() - startTime;
@@ -90,7 +119,7 @@ export class LLMClient {
         lastError = error as Error;
 
         // Check if error is retryable
-        if (!this._isRetryableError(error) || attempt === this._maxRetries) {
+        if (emitted || !this._isRetryableError(error) || attempt === this._maxRetries) {
           break;
         }
 
@@ -108,7 +137,7 @@ export class LLMClient {
     const statusCode = this._extractStatusCode(lastError);
 
     throw new LLMError(
-      `LLM query failed after ${this._maxRetries} attempts: ${errorMessage}`,
+      `LLM query failed after ${attempts} attempt(s): ${errorMessage}`,
       statusCode || undefined
     );
   }
@@ -116,10 +145,11 @@ export class LLMClient {
   private async _executeQuery(
     messages: Message[],
     tools: ToolSchema[],
-    maxTokens?: number
+    maxTokens?: number,
+    onContent?: (delta: string) => void
   ): Promise<LLMResponse> {
     try {
-      const completion = await this._client.chat.completions.create({
+      const stream = await this._client.chat.completions.create({
         model: this._config.llm.modelName,
         messages: messages.map(m => {
           if (m.role === 'system') {
@@ -166,51 +196,91 @@ export class LLMClient {
           // This should never happen with proper typing
           throw new Error(`Unknown message role: ${(m as any).role}`);
         }),
-        tools: tools.map(tool => ({
-          type: tool.type,
-          function: tool.function,
-        })),
+        tools,
         temperature: this._config.llm.temperature,
         top_p: this._config.llm.topP,
         ...(maxTokens && { max_tokens: maxTokens }),
-        stream: false,
+        // Stream so the caller can show text as soon as the first token arrives
+        stream: true,
+        stream_options: { include_usage: true },
         // Enable function calling
         tool_choice: 'auto',
       });
 
-      const choice = completion.choices[0];
-      if (!choice) {
-        throw new LLMError('No response choices returned from LLM');
-      }
+      let content = '';
+      let model = this._config.llm.modelName;
+      let finishReason: string | null = null;
+      let usage: LLMResponse['usage'] = null;
+      let receivedChoice = false;
+
+      // Tool call fragments are spread over chunks and keyed by their index
+      const toolCalls = new Map<number, ToolCall>();
+
+      for await (const chunk of stream) {
+        model = chunk.model || model;
+
+        // The usage chunk comes last and carries no choices
+        if (chunk.usage) {
+          usage = {
+            promptTokens: chunk.usage.prompt_tokens,
+            completionTokens: chunk.usage.completion_tokens,
+            totalTokens: chunk.usage.total_tokens,
+          };
+        }
 
-      const message = choice.message;
-      const toolCalls: ToolCall[] = [];
+        const choice = chunk.choices[0];
+        if (!choice) {
+          continue;
+        }
+        receivedChoice = true;
 
-      // Parse tool calls if present
-      if (message.tool_calls) {
-        for (const toolCall of message.tool_calls) {
-          toolCalls.push({
-            id: toolCall.id,
-            type: toolCall.type,
-            function: {
-              name: toolCall.function.name,
-              arguments: toolCall.function.arguments,
-            },
-          });
+        const delta = choice.delta;
+        if (delta.content) {
+          content += delta.content;
+          onContent?.(delta.content);
+        }
+
+        // Merge tool call fragments
+        if (delta.tool_calls) {
+          for (const fragment of delta.tool_calls) {
+            let toolCall = toolCalls.get(fragment.index);
+            if (!toolCall) {
+              toolCall = {
+                id: '',
+                type: 'function',
+                function: { name: '', arguments: '' },
+              };
+              toolCalls.set(fragment.index, toolCall);
+            }
+
+            if (fragment.id) {
+              toolCall.id = fragment.id;
+            }
+            if (fragment.function?.name) {
+              toolCall.function.name += fragment.function.name;
+            }
+            if (fragment.function?.arguments) {
+              toolCall.function.arguments += fragment.function.arguments;
+            }
+          }
+        }
+
+        if (choice.finish_reason) {
+          finishReason = choice.finish_reason;
         }
       }
 
+      if (!receivedChoice) {
+        throw new LLMError('No response choices returned from LLM');
+      }
+
       return {
-        message: message.content || '',
-        toolCalls,
-        usage: completion.usage ? {
-          promptTokens: completion.usage.prompt_tokens,
-          completionTokens: completion.usage.completion_tokens,
-          totalTokens: completion.usage.total_tokens,
-        } : null,
+        message: content,
+        toolCalls: [...toolCalls.values()],
+        usage,
         metadata: {
-          model: completion.model,
-          finishReason: choice.finish_reason || null,
+          model,
+          finishReason,
           responseTime: 0, // Will be set by caller
         },
       };
@@ -313,6 +383,28 @@ export class LLMClient {
     }
   }
 
+  warmup(signal?: AbortSignal): Promise<void> {
+    // A bare GET of the API base URL, without credentials: whatever the status,
+    // DNS and the TCP/TLS handshake are done and the socket stays in the
+    // keep-alive pool for the first query (Node does not pool it after a HEAD)
+    const url = new URL(this._config.llm.baseUrl);
+    const send = url.protocol === 'http:' ? httpRequest : httpsRequest;
+
+    return new Promise(resolve => {
+      const options = { agent: this._agent, ...(signal && { signal }) };
+      const request = send(url, options, response => {
+        // Drain so the socket goes back to the pool
+        response.on('end', () => resolve());
+        response.resume();
+      });
+      request.on('error', () => {
+        // Best effort (aborts land here too); the first query connects on its own
+        resolve();
+      });
+      request.end();
+    });
+  }
+
   getModelInfo(): {
     name: string;
     endpoint: string;
@@ -5,29 +5,39 @@ import chalk from 'chalk';
 import ora, { type Ora } from 'ora';
 import boxen from 'boxen';
 import gradient from 'gradient-string';
-import { basename } from 'node:path';
+import { basename, join } from 'node:path';
 import { homedir } from 'node:os';
+import { mkdirSync } from 'node:fs';
 import { Config, getConfig, AVAILABLE_MODELS } from './config.js';
 import { Bash } from './bash.js';
 import { MessageManager } from './messages.js';
 import { LLMClient, type LLMResponse } from './llm.js';
+import { truncate, truncateStart } from './utils.js';
 import type {
   CLIOptions,
   UserInput,
   CommandResult,
   ToolCall,
+  ToolSchema,
   ModelConfig
 } from './types.js';
 import {
   AgentError
 } from './types.js';
 
+const THINK_DIRECTIVE = '/think';
+
+// Output sent back to the model per stream; both streams together stay around
+// 16K characters (~4K tokens). The user still sees the full output
+const MAX_TOOL_OUTPUT_CHARS = 8 * 1024;
+
 class CLIApplication {
   private readonly _config: Config;
   private readonly _bash: Bash;
   private readonly _llm: LLMClient;
   private readonly _messages: MessageManager;
   private readonly _options: CLIOptions;
+  private readonly _tools: ToolSchema[];
   private _isRunning: boolean = true;
 
   constructor(options: CLIOptions = {}, modelName?: string) {
@@ -39,10 +49,14 @@ class CLIApplication {
       this._bash = new Bash(this._config);
       this._llm = new LLMClient(this._config);
       this._messages = new MessageManager(this._config.systemPrompt, 200);
+      this._tools = [this._bash.getToolSchema()];
 
       // Register command prompt for history support
       inquirer.registerPrompt('command', commandPrompt);
 
+      // Persist prompt history across sessions in the agent's own directory
+      this._configurePromptHistory();
+
       // Override config with command line options
       this._applyCLIOptions();
     } catch (error) {
@@ -54,6 +68,27 @@ class CLIApplication {
     }
   }
 
+  private _configurePromptHistory(): void {
+    const configHome = process.env['XDG_CONFIG_HOME'] || join(homedir(), '.config');
+    const historyDir = join(configHome, 'computer-use-agent');
+
+    try {
+      mkdirSync(historyDir, { recursive: true, mode: 0o700 });
+    } catch {
+      // No writable config directory; keep history in memory only
+      return;
+    }
+
+    commandPrompt.setConfig({
+      history: {
+        save: true,
+        folder: historyDir,
+        limit: 100,
+        blacklist: ['quit', 'exit', 'q', 'clear', 'cwd'],
+      },
+    });
+  }
+
   static async selectModel(): Promise<string> {
     console.log(chalk.cyan.bold('\n🤖 Select an LLM model:\n'));
 
@@ -93,6 +128,11 @@ class CLIApplication {
   async start(): Promise<void> {
     this._printWelcome();
 
+    // Open the API connection while the user types the first request; aborted
+    // on exit so a pending warm-up never holds the process open
+    const warmup = new AbortController();
+    void this._llm.warmup(warmup.signal);
+
     // Test LLM connection in verbose mode
     if (this._options.verbose) {
       await this._testLLMConnection();
@@ -107,6 +147,8 @@ class CLIApplication {
       }
     }
 
+    warmup.abort();
+    this._bash.dispose();
     this._printGoodbye();
   }
 
@@ -215,47 +257,77 @@ class CLIApplication {
   }
 
   private async _processRequest(): Promise<void> {
-    // Continue processing until no more tool calls
-    while (true) {
-      // Show thinking indicator with ora spinner
-      const spinner = ora({
-        text: chalk.cyan('Thinking...'),
-        spinner: 'dots',
-      }).start();
+    // Show thinking indicator with ora spinner
+    const spinner = ora({
+      text: chalk.cyan('Thinking...'),
+      spinner: 'dots',
+    }).start();
+
+    // Print text as it streams in. A possible /think prefix is resolved once,
+    // then deltas go straight through with only trailing whitespace held back
+    let head: string | null = '';
+    let held = '';
+    let printed = false;
+    const onContent = (delta: string): void => {
+      let text = delta;
+      if (head !== null) {
+        head += delta;
+        if (head.length < THINK_DIRECTIVE.length && THINK_DIRECTIVE.startsWith(head)) {
+          return;
+        }
+        text = head.startsWith(THINK_DIRECTIVE) ? head.substring(THINK_DIRECTIVE.length) : head;
+        head = null;
+      }
 
-      try {
-        // Query the LLM
-        const response: LLMResponse = await this._llm.query(
-          this._messages,
-          [this._bash.getToolSchema()]
-        );
+      text = held + text;
+      if (!printed) {
+        text = text.trimStart();
+      }
+      const visible = text.trimEnd();
+      held = text.substring(visible.length);
+      if (!visible) {
+        return;
+      }
 
-        // Stop spinner successfully
+      if (!printed) {
         spinner.succeed(chalk.green('Response ready'));
+        process.stdout.write('\n');
+        printed = true;
+      }
+      process.stdout.write(chalk.white(visible));
+    };
 
-        // Handle assistant's text response
-        if (response.message) {
-          const content = this._filterThinkDirective(response.message);
-          if (content) {
-            console.log(chalk.white(`\n${content}`));
-            this._messages.addAssistantMessage(content);
-          }
-        }
+    try {
+      // Query the LLM
+      const response: LLMResponse = await this._llm.query(
+        this._messages,
+        this._tools,
+        undefined,
+        onContent
+      );
+
+      // Stop spinner successfully
+      if (spinner.isSpinning) {
+        spinner.succeed(chalk.green('Response ready'));
+      }
 
-        // Handle tool calls (execute bash commands)
-        if (response.toolCalls.length > 0) {
-          await this._handleToolCalls(response.toolCalls);
-          // After executing commands, break to wait for user input
-          break;
+      // Handle assistant's text response
+      if (response.message) {
+        const content = this._filterThinkDirective(response.message);
+        if (content) {
+          // Streamed text is already on screen; only finish the line
+          console.log(printed ? '' : chalk.white(`\n${content}`));
+          this._messages.addAssistantMessage(content);
         }
+      }
 
-        // No more tool calls, exit loop
-        break;
-
-      } catch (error) {
-        spinner.fail(chalk.red('Error occurred'));
-        throw error;
+      // Handle tool calls (execute bash commands), then wait for user input
+      if (response.toolCalls.length > 0) {
+        await this._handleToolCalls(response.toolCalls);
       }
+    } catch (error) {
+      spinner.fail(chalk.red('Error occurred'));
+      throw error;
     }
   }
 
@@ -316,25 +388,28 @@ class CLIApplication {
           spinner: 'dots',
         }).start();
 
+        // Show the latest output line while long-running commands work
+        const onOutput = (chunk: string): void => {
+          const text = chunk.trimEnd();
+          const line = text.slice(text.lastIndexOf('\n') + 1);
+          if (line) {
+            execSpinner.text = `${chalk.cyan('Executing command...')} ${chalk.gray(truncate(line, 60))}`;
+          }
+        };
+
         try {
-          const result = await this._bash.execBashCommand(command);
+          const result = await this._bash.execBashCommand(command, onOutput);
           execSpinner.stop();
 
           // Display results with modern UI
           this._displayCommandResult(result);
 
-          // Add result to messages
-          const toolResult = {
-            stdout: result.stdout || '',
-            stderr: result.stderr || '',
-            cwd: result.cwd,
-            exitCode: result.exitCode || 0,
-          };
-
-          this._messages.addToolMessage(
-            JSON.stringify(toolResult),
-            toolCall.id
-          );
+          // Add result to messages; it already carries stdout, stderr, cwd and exitCode
+          this._messages.addToolMessage({
+            ...result,
+            stdout: truncateStart(result.stdout, MAX_TOOL_OUTPUT_CHARS),
+            stderr: truncateStart(result.stderr, MAX_TOOL_OUTPUT_CHARS),
+          }, toolCall.id);
         } catch (error) {
           execSpinner.fail(chalk.red('Execution failed'));
 
@@ -415,8 +490,8 @@ class CLIApplication {
   }
 
   private _filterThinkDirective(content: string): string {
-    if (content.startsWith('/think')) {
-      return content.substring(5).trim();
+    if (content.startsWith(THINK_DIRECTIVE)) {
+      return content.substring(THINK_DIRECTIVE.length).trim();
     }
     return content.trim();
   }
@@ -6,13 +6,15 @@ import type {
   ToolMessage,
   ToolCall,
   SystemMessage,
-  UserMessage
+  UserMessage,
+  CommandResult
 } from './types.js';
 
 const CONTEXT_SEPARATOR = 'ς';
 
 export class MessageManager {
-  private _systemMessage: BaseMessage | null = null;
+  private _systemMessage: SystemMessage | null = null;
+  // Full conversation as sent to the API; the system message, if any, is at index 0
   private _messages: Message[] = [];
   private _maxMessages: number;
 
@@ -23,11 +25,23 @@ export class MessageManager {
     }
   }
 
+  // Index of the first conversation message after the system message
+  private get _historyStart(): number {
+    return this._systemMessage ? 1 : 0;
+  }
+
   setSystemMessage(message: string): void {
-    this._systemMessage = {
+    const systemMessage: SystemMessage = {
       role: 'system',
       content: message,
     };
+
+    if (this._systemMessage) {
+      this._messages[0] = systemMessage;
+    } else {
+      this._messages.unshift(systemMessage);
+    }
+    this._systemMessage = systemMessage;
   }
 
   getSystemMessage(): BaseMessage | null {
@@ -55,10 +69,11 @@ export class MessageManager {
     this.trimMessages();
   }
 
-  addToolMessage(content: string, toolCallId: string): void {
+  addToolMessage(content: string | CommandResult, toolCallId: string): void {
     const message: ToolMessage = {
       role: 'tool',
-      content,
+      // Strings are stored untouched; command results are sent as JSON
+      content: typeof content === 'string' ? content : JSON.stringify(content),
       tool_call_id: toolCallId,
     };
 
@@ -67,15 +82,12 @@ export class MessageManager {
   }
 
   getMessages(): Message[] {
-    if (!this._systemMessage) {
-      return this._messages;
-    }
-
-    return this._systemMessage ? [{ ...this._systemMessage, role: 'system' as const }, ...this._messages] : this._messages;
+    // Returned as-is; no per-turn copy of the growing history
+    return this._messages;
   }
 
   getLastMessages(count: number): Message[] {
-    return this._messages.slice(-count);
+    return this._messages.slice(this._historyStart).slice(-count);
   }
 
   getLastUserMessage(): UserMessage | null {
@@ -121,10 +133,6 @@ export class MessageManager {
       tool: 0,
     };
 
-    if (this._systemMessage) {
-      counts.system = 1;
-    }
-
     for (const message of this._messages) {
       counts[message.role]++;
     }
@@ -143,7 +151,7 @@ export class MessageManager {
   }
 
   clearMessages(): void {
-    this._messages = [];
+    this._messages.splice(this._historyStart);
   }
 
   reset(): void {
@@ -152,31 +160,33 @@ export class MessageManager {
   }
 
   private trimMessages(): void {
-    if (this._messages.length <= this._maxMessages) {
+    const start = this._historyStart;
+    const length = this._messages.length - start;
+    if (length <= this._maxMessages) {
       return;
     }
 
     // Keep the last maxMessages messages
     // Always try to keep conversation pairs (user-assistant) intact
-    const excess = this._messages.length - this._maxMessages;
+    const excess = length - this._maxMessages;
 
     // Find a good cutoff point (preferably after a user message)
     let cutoff = excess;
-    for (let i = excess; i < this._messages.length - 1; i++) {
-      const message = this._messages[i];
+    for (let i = excess; i < length - 1; i++) {
+      const message = this._messages[start + i];
       if (message && message.role === 'user') {
         cutoff = i + 1;
         break;
       }
     }
 
-    // Remove excess messages from the beginning
-    this._messages = this._messages.slice(cutoff);
+    // Remove excess messages from the beginning, keeping the system message
+    this._messages.splice(start, cutoff);
 
     // Add context separator to indicate trimming occurred (NVIDIA's approach)
-    if (this._messages.length > 0 && this._messages[0]?.role === 'user') {
+    if (this._messages.length > start && this._messages[start]?.role === 'user') {
       // Add separator as a system message to indicate context break
-      this._messages.unshift({
+      this._messages.splice(start, 0, {
         role: 'system',
         content: `${CONTEXT_SEPARATOR} Context trimmed: ${excess} messages removed to maintain conversation history ${CONTEXT_SEPARATOR}`
       });
@@ -184,11 +194,13 @@ export class MessageManager {
   }
 
   exportConversation(): string {
+    const messages = this._messages.slice(this._historyStart);
+
     return JSON.stringify({
       systemMessage: this._systemMessage,
-      messages: this._messages,
+      messages,
       timestamp: new Date().toISOString(),
-      messageCount: this._messages.length,
+      messageCount: messages.length,
     }, null, 2);
   }
 
@@ -196,13 +208,15 @@ export class MessageManager {
     try {
       const data = JSON.parse(json);
 
+      const messages: Message[] = Array.isArray(data.messages)
+        ? data.messages
+        : this._messages.slice(this._historyStart);
+
       if (data.systemMessage) {
         this._systemMessage = data.systemMessage;
       }
 
-      if (Array.isArray(data.messages)) {
-        this._messages = data.messages;
-      }
+      this._messages = this._systemMessage ? [this._systemMessage, ...messages] : messages;
 
       // Trim messages if needed after import
       this.trimMessages();
@@ -218,7 +232,7 @@ export class MessageManager {
     hasSystemMessage: boolean;
   } {
     return {
-      totalMessages: this._messages.length,
+      totalMessages: this._messages.length - this._historyStart,
       messageCounts: this.getMessageCounts(),
       totalToolCalls: this.getAllToolCalls().length,
       hasSystemMessage: !!this._systemMessage,
@@ -241,7 +255,7 @@ export class MessageManager {
   }
 
   isEmpty(): boolean {
-    return this._messages.length === 0 ||
+    return this._messages.length === this._historyStart ||
            !this._messages.some(m => m.role === 'user');
   }
 }
\ No newline at end of file
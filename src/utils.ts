@@ -1,9 +1,11 @@
 import { basename, extname, relative } from 'node:path';
 import { fileURLToPath } from 'node:url';
 
+const WHITESPACE_CHAR_PATTERN = /\s/;
+
 export function extractBaseCommand(command: string): string {
   const trimmed = command.trim();
-  const firstSpace = trimmed.indexOf(' ');
+  const firstSpace = trimmed.search(WHITESPACE_CHAR_PATTERN);
   return firstSpace > 0 ? trimmed.substring(0, firstSpace) : trimmed;
 }
 
@@ -18,6 +20,40 @@ export function truncate(str: string, maxLength: number): string {
   return str.substring(0, maxLength - 3) + '...';
 }
 
+// Notice written by truncateStart; read back so repeated cuts keep an exact count
+const OMITTED_NOTICE_PATTERN = /^\[(\d+) earlier characters omitted\]\n/;
+
+// Keeps the last maxLength characters behind an omission notice. `omitted`
+// counts characters the caller already cut from the front of str
+export function truncateStart(str: string, maxLength: number, omitted: number = 0): string {
+  if (omitted === 0 && str.length <= maxLength) {
+    return str;
+  }
+
+  let kept = str;
+  let cutMidLine = omitted > 0;
+  const notice = OMITTED_NOTICE_PATTERN.exec(kept);
+  if (notice) {
+    omitted += Number(notice[1]);
+    kept = kept.substring(notice[0].length);
+  }
+
+  if (kept.length > maxLength) {
+    omitted += kept.length - maxLength;
+    kept = kept.substring(kept.length - maxLength);
+    cutMidLine = true;
+  }
+
+  // Start on the next line if one begins before the end; one long line stays cut
+  const lineStart = cutMidLine ? kept.indexOf('\n') + 1 : 0;
+  if (lineStart > 0 && lineStart < kept.length) {
+    omitted += lineStart;
+    kept = kept.substring(lineStart);
+  }
+
+  return omitted > 0 ? `[${omitted} earlier characters omitted]\n${kept}` : kept;
+}
+
 export function formatBytes(bytes: number, decimals: number = 2): string {
   if (bytes === 0) return '0 Bytes';
 